@@ -0,0 +1,210 @@
+"""
+Module Documentation:
+This module is used to store the quantized coefficients of the integer JPEG path
+in a container that can be decoded in parallel, or only in part.
+The image is split into tile groups of tile_blocks x tile_blocks 8x8 blocks.
+Every tile group is coded on its own (zlib over int16 coefficients), so it acts
+as a restart interval: it can be decoded without reading anything before it.
+File layout (little-endian):
+1. Header: magic, version, channels, tile_blocks, width, height.
+2. The 8x8 fixed-point dequantization table (int32).
+3. The number of tile groups, then an index of (offset, length) per tile group, row-major.
+4. The tile group payloads.
+"""
+
+import os
+import struct
+import zlib
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+from JPEG_Compression import integer_dequantize_idct
+
+MAGIC = b"IPCF"
+VERSION = 2
+HEADER = struct.Struct("<4sBBHII")
+INDEX_ENTRY = struct.Struct("<QI")
+COUNT = struct.Struct("<I")
+
+
+def write_container(compressor, output_path, tile_blocks=16):
+    """
+    Function Documentation:
+    Quantize the image of a Compressor with the integer path and write it as tile groups
+    Args:
+    compressor: The Compressor holding the image, quantization matrix and quality
+                (must use dct_mode="integer", raises ValueError otherwise)
+    output_path: The path of the container file
+    tile_blocks: The height and width of a tile group, in 8x8 blocks
+    Returns:
+    The size of the written file in bytes
+    """
+    if compressor.dct_mode != "integer":
+        raise ValueError("write_container needs a Compressor created with dct_mode='integer'.")
+    # Raises ValueError for a quality outside the fixed-point range, before any work is done
+    _, _, dequant_multiplier = compressor.integer_tables()
+
+    image_array = np.array(compressor.image)
+    if image_array.ndim == 2:
+        image_array = image_array[:, :, np.newaxis]
+    h, w, channels = image_array.shape
+
+    # (rows of blocks, columns of blocks, channels, 8, 8)
+    quantized = np.stack(
+        [compressor.integer_quantize_channel(image_array[:, :, k]) for k in range(channels)],
+        axis=2,
+    )
+
+    payloads = []
+    for i in range(0, quantized.shape[0], tile_blocks):
+        for j in range(0, quantized.shape[1], tile_blocks):
+            tile = np.ascontiguousarray(quantized[i:i+tile_blocks, j:j+tile_blocks])
+            payloads.append(zlib.compress(tile.astype("<i2").tobytes()))
+
+    offset = (HEADER.size + dequant_multiplier.size * 4 + COUNT.size
+              + INDEX_ENTRY.size * len(payloads))
+    with open(output_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, channels, tile_blocks, w, h))
+        f.write(dequant_multiplier.astype("<i4").tobytes())
+        f.write(COUNT.pack(len(payloads)))
+        for payload in payloads:
+            f.write(INDEX_ENTRY.pack(offset, len(payload)))
+            offset += len(payload)
+        for payload in payloads:
+            f.write(payload)
+    return offset
+
+
+def _read_exactly(f, size):
+    """Read size bytes, raising ValueError if the file ends first"""
+    data = f.read(size)
+    if len(data) != size:
+        raise ValueError("Corrupt container: the header or index is truncated")
+    return data
+
+
+def _decode_tile(task):
+    """
+    Function Documentation:
+    Decode one tile group (runs in a worker process, reads only its own bytes)
+    Args:
+    task: (path, offset, length, rows of blocks, columns of blocks, channels, dequant table)
+    Returns:
+    The tile pixels, shape (rows * 8, columns * 8, channels)
+    """
+    path, offset, length, rows, cols, channels, dequant_multiplier = task
+    with open(path, "rb") as f:
+        f.seek(offset)
+        payload = f.read(length)
+    quantized = np.frombuffer(zlib.decompress(payload), dtype="<i2")
+    quantized = quantized.reshape(rows, cols, channels, 8, 8)
+    blocks = integer_dequantize_idct(quantized, dequant_multiplier)
+    return blocks.transpose(0, 3, 1, 4, 2).reshape(rows * 8, cols * 8, channels)
+
+
+class ContainerDecoder:
+    """
+    Class Documentation:
+    This class is used to decode a container written by write_container,
+    either whole or only a region of it, across several worker processes.
+    Pass a long-lived executor to avoid paying process start-up on every decode.
+
+    Args:
+    path: The path of the container file.
+    executor: An optional concurrent.futures executor used by every decode call.
+
+    Attributes:
+    width, height, channels: The size of the stored image.
+    tile_blocks: The size of a tile group, in 8x8 blocks.
+    index: The (offset, length) of every tile group, row-major.
+
+    Methods:
+    decode: The method used to decode the image or a region of it.
+    """
+
+    def __init__(self, path, executor=None):
+        """
+        Function Documentation:
+        The constructor method used to read the header and the index.
+        """
+        self.path = path
+        self.executor = executor
+        with open(path, "rb") as f:
+            magic, version, self.channels, self.tile_blocks, self.width, self.height = (
+                HEADER.unpack(_read_exactly(f, HEADER.size))
+            )
+            if magic != MAGIC or version != VERSION:
+                raise ValueError("Not a supported compressed container")
+            self.dequant_multiplier = np.frombuffer(_read_exactly(f, 64 * 4), dtype="<i4")
+            self.dequant_multiplier = self.dequant_multiplier.astype(np.int32).reshape(8, 8)
+            (count,) = COUNT.unpack(_read_exactly(f, COUNT.size))
+            self.index = [
+                INDEX_ENTRY.unpack(_read_exactly(f, INDEX_ENTRY.size)) for _ in range(count)
+            ]
+
+        self.block_rows = -(-self.height // 8)
+        self.block_cols = -(-self.width // 8)
+        self.tile_rows = -(-self.block_rows // self.tile_blocks)
+        self.tile_cols = -(-self.block_cols // self.tile_blocks)
+
+        if count != self.tile_rows * self.tile_cols:
+            raise ValueError(
+                f"Corrupt container: {count} tile groups, expected {self.tile_rows * self.tile_cols}"
+            )
+        if max((offset + length for offset, length in self.index), default=0) > os.path.getsize(path):
+            raise ValueError("Corrupt container: the file is truncated")
+
+    def decode(self, region=None, workers=1):
+        """
+        Function Documentation:
+        Decode the tile groups that overlap a region
+        Args:
+        region: (x, y, width, height) in pixels, or None for the whole image
+        workers: The number of worker processes of a pool created for this call only,
+                 when the decoder has no executor (1 decodes serially)
+        Returns:
+        The decoded pixels of the region, shape (height, width) or (height, width, channels)
+        """
+        if region is None:
+            region = (0, 0, self.width, self.height)
+        x, y, w, h = region
+        if w <= 0 or h <= 0 or x < 0 or y < 0 or x + w > self.width or y + h > self.height:
+            raise ValueError("Region is outside the image")
+
+        span = self.tile_blocks * 8
+        first_row, last_row = y // span, (y + h - 1) // span
+        first_col, last_col = x // span, (x + w - 1) // span
+
+        tasks, origins = [], []
+        for row in range(first_row, last_row + 1):
+            for col in range(first_col, last_col + 1):
+                offset, length = self.index[row * self.tile_cols + col]
+                rows = min(self.tile_blocks, self.block_rows - row * self.tile_blocks)
+                cols = min(self.tile_blocks, self.block_cols - col * self.tile_blocks)
+                tasks.append((self.path, offset, length, rows, cols,
+                              self.channels, self.dequant_multiplier))
+                origins.append((row * span, col * span))
+
+        # Tiles are placed into a buffer aligned to the tile grid, then cropped to the region
+        top, left = first_row * span, first_col * span
+        decoded = np.zeros(
+            (min((last_row + 1) * span, self.block_rows * 8) - top,
+             min((last_col + 1) * span, self.block_cols * 8) - left,
+             self.channels),
+            dtype=np.uint8,
+        )
+
+        def place(tiles):
+            for (ty, tx), tile in zip(origins, tiles):
+                decoded[ty - top : ty - top + tile.shape[0], tx - left : tx - left + tile.shape[1]] = tile
+
+        if len(tasks) == 1 or (self.executor is None and workers <= 1):
+            place(map(_decode_tile, tasks))
+        elif self.executor is not None:
+            place(self.executor.map(_decode_tile, tasks))
+        else:
+            with ProcessPoolExecutor(min(workers, len(tasks))) as pool:
+                place(pool.map(_decode_tile, tasks))
+
+        decoded = decoded[y - top : y - top + h, x - left : x - left + w]
+        return decoded[:, :, 0] if self.channels == 1 else decoded
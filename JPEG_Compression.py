@@ -20,6 +20,131 @@ import numpy as np
 from PIL import Image
 from scipy.fftpack import dct  as DCT
 from scipy.fftpack import idct  as IDCT
+import time
+import tracemalloc
+
+# Fixed-point constants of the AAN (Arai, Agui, Nakajima) fast 8-point DCT, scaled by 2^8
+AAN_CONST_BITS = 8
+FIX_0_382683433 = 98
+FIX_0_541196100 = 139
+FIX_0_707106781 = 181
+FIX_1_306562965 = 334
+FIX_1_082392200 = 277
+FIX_1_414213562 = 362
+FIX_1_847759065 = 473
+FIX_2_613125930 = 669
+
+# Per-frequency output scale of the AAN transform: 1 for DC, sqrt(2) * cos(k * pi / 16) otherwise
+AAN_SCALE = np.array([1.0] + [np.sqrt(2) * np.cos(k * np.pi / 16) for k in range(1, 8)])
+
+# Extra precision bits of the forward transform input
+AAN_PASS_BITS = 2
+# Quantization reciprocals are kept in [2^14, 2^15) with a per-coefficient shift,
+# so |coefficient| * reciprocal stays below 2^31
+RECIPROCAL_BITS = 15
+# Fractional bits of the dequantization multipliers, and the ones kept between the
+# two IDCT passes; this keeps every IDCT intermediate below 2^30 in int32
+DEQUANT_BITS = 9
+IDCT_PASS1_BITS = 2
+# Block rows transformed per batch, so the int32 working buffers do not grow with the image
+INTEGER_STRIP_ROWS = 16
+# Qualities for which quantized coefficients fit int16 and the IDCT fits int32
+MIN_INTEGER_QUALITY = 1
+MAX_INTEGER_QUALITY = 1000
+
+
+def _descale(x, n):
+    """Right shift with rounding"""
+    return (x + (1 << (n - 1))) >> n
+
+
+def _multiply(x, const):
+    """Multiply by a fixed-point constant"""
+    return _descale(x * const, AAN_CONST_BITS)
+
+
+def _aan_fdct_1d(x):
+    """
+    Function Documentation:
+    AAN forward DCT over the last axis of an int32 array of 8-sample rows.
+    The outputs are scaled by 8 * AAN_SCALE[k]; the scale is folded into quantization.
+    """
+    d = [x[..., k] for k in range(8)]
+    tmp0, tmp7 = d[0] + d[7], d[0] - d[7]
+    tmp1, tmp6 = d[1] + d[6], d[1] - d[6]
+    tmp2, tmp5 = d[2] + d[5], d[2] - d[5]
+    tmp3, tmp4 = d[3] + d[4], d[3] - d[4]
+
+    # Even part
+    tmp10, tmp13 = tmp0 + tmp3, tmp0 - tmp3
+    tmp11, tmp12 = tmp1 + tmp2, tmp1 - tmp2
+    out0, out4 = tmp10 + tmp11, tmp10 - tmp11
+    z1 = _multiply(tmp12 + tmp13, FIX_0_707106781)
+    out2, out6 = tmp13 + z1, tmp13 - z1
+
+    # Odd part
+    tmp10, tmp11, tmp12 = tmp4 + tmp5, tmp5 + tmp6, tmp6 + tmp7
+    z5 = _multiply(tmp10 - tmp12, FIX_0_382683433)
+    z2 = _multiply(tmp10, FIX_0_541196100) + z5
+    z4 = _multiply(tmp12, FIX_1_306562965) + z5
+    z3 = _multiply(tmp11, FIX_0_707106781)
+    z11, z13 = tmp7 + z3, tmp7 - z3
+    out5, out3 = z13 + z2, z13 - z2
+    out1, out7 = z11 + z4, z11 - z4
+
+    return np.stack([out0, out1, out2, out3, out4, out5, out6, out7], axis=-1)
+
+
+def _aan_idct_1d(x):
+    """
+    Function Documentation:
+    AAN inverse DCT over the last axis of an int32 array of 8 coefficients
+    that were pre-multiplied by AAN_SCALE[k] (folded into dequantization).
+    """
+    c = [x[..., k] for k in range(8)]
+
+    # Even part
+    tmp10, tmp11 = c[0] + c[4], c[0] - c[4]
+    tmp13 = c[2] + c[6]
+    tmp12 = _multiply(c[2] - c[6], FIX_1_414213562) - tmp13
+    tmp0, tmp3 = tmp10 + tmp13, tmp10 - tmp13
+    tmp1, tmp2 = tmp11 + tmp12, tmp11 - tmp12
+
+    # Odd part
+    z13, z10 = c[5] + c[3], c[5] - c[3]
+    z11, z12 = c[1] + c[7], c[1] - c[7]
+    tmp7 = z11 + z13
+    tmp11 = _multiply(z11 - z13, FIX_1_414213562)
+    z5 = _multiply(z10 + z12, FIX_1_847759065)
+    tmp10 = _multiply(z12, FIX_1_082392200) - z5
+    tmp12 = _multiply(z10, -FIX_2_613125930) + z5
+    tmp6 = tmp12 - tmp7
+    tmp5 = tmp11 - tmp6
+    tmp4 = tmp10 + tmp5
+
+    return np.stack(
+        [tmp0 + tmp7, tmp1 + tmp6, tmp2 + tmp5, tmp3 - tmp4,
+         tmp3 + tmp4, tmp2 - tmp5, tmp1 - tmp6, tmp0 - tmp7],
+        axis=-1,
+    )
+
+
+def integer_dequantize_idct(quantized, dequant_multiplier):
+    """
+    Function Documentation:
+    Dequantize and apply the integer AAN IDCT to a batch of quantized blocks
+    Args:
+    quantized: The quantized coefficients, shape (..., 8, 8)
+    dequant_multiplier: The fixed-point dequantization table (see Compressor.integer_tables)
+    Returns:
+    The reconstructed uint8 blocks
+    """
+    coefficients = quantized.astype(np.int32) * dequant_multiplier
+    rows = _descale(_aan_idct_1d(coefficients), DEQUANT_BITS - IDCT_PASS1_BITS)
+    samples = _aan_idct_1d(rows.swapaxes(-1, -2)).swapaxes(-1, -2)
+    samples = _descale(samples, IDCT_PASS1_BITS + 3) + 128
+    return np.clip(samples, 0, 255).astype(np.uint8)
+
 
 class Compressor:
     """
@@ -28,23 +153,29 @@ class Compressor:
     Args:
     image_path: The path of the input image file.
     quality: The quality of the compressed image.
+    dct_mode: "float" (scipy, per block) or "integer" (fixed-point AAN, batched over block rows).
 
     Attributes:
     quality: The quality of the compressed image.
     image_path: The path of the input image file.
     quant_matrix: The quantization matrix.
     image: The input image.
+    dct_mode: The transform path used by compress.
     """
-    def __init__(self,image_path, quality=100):
+    def __init__(self,image_path, quality=100, dct_mode="float"):
         """
         Function Documentation:
         The constructor method used to initialize the class attributes.
         Args:
         image_path: The path of the input image file.
         quality: The quality of the compressed image.
+        dct_mode: The transform path, "float" or "integer".
         """
+        if dct_mode not in ("float", "integer"):
+            raise ValueError("Invalid dct_mode. Choose from 'float', 'integer'.")
         self.quality = quality
         self.image_path = image_path
+        self.dct_mode = dct_mode
         self.quant_matrix = np.array([[16, 11, 10, 16, 24, 40, 51, 61],
                                       [12, 12, 14, 19, 26, 58, 60, 55],
                                       [14, 13, 16, 24, 40, 57, 69, 56],
@@ -53,6 +184,8 @@ class Compressor:
                                       [24, 35, 55, 64, 81, 104, 113, 92],
                                       [49, 64, 78, 87, 103, 121, 120, 101],
                                       [72, 92, 95, 98, 112, 100, 103, 99]])
+        if dct_mode == "integer":
+            self.integer_tables()  # rejects qualities the integer path cannot represent
         try :
             self.image = Image.open(self.image_path)
         except FileNotFoundError:
@@ -129,31 +262,144 @@ class Compressor:
         return compressed_image
 
 
-    def grayscale_compression(self):
+    def integer_tables(self):
         """
         Function Documentation:
-        Compress the image
-        Saves the compressed image to the disk (adds a suffix "_compressed" to the original image name)
+        Build the fixed-point tables of the integer path, with the AAN output scale
+        folded into the quantization step
         Args:
         None
         Returns:
-        compressed_image: The compressed image
+        quant_reciprocal: 2^quant_shift / divisor of each forward AAN coefficient (int32)
+        quant_shift: The shift of each reciprocal (int32)
+        dequant_multiplier: 2^DEQUANT_BITS * step * AAN scale of each coefficient (int32)
+        """
+        if not MIN_INTEGER_QUALITY <= self.quality <= MAX_INTEGER_QUALITY:
+            raise ValueError(
+                f"The integer path supports quality from {MIN_INTEGER_QUALITY} to {MAX_INTEGER_QUALITY}."
+            )
+        step = self.quant_matrix * self.quality / 100
+        scale = np.outer(AAN_SCALE, AAN_SCALE)
+        divisor = step * scale * (8 << AAN_PASS_BITS)
+        quant_shift = np.floor(np.log2(divisor * (1 << RECIPROCAL_BITS))).astype(np.int32)
+        quant_reciprocal = np.round(2.0 ** quant_shift / divisor).astype(np.int32)
+        dequant_multiplier = np.round(step * scale * (1 << DEQUANT_BITS)).astype(np.int32)
+        return quant_reciprocal, quant_shift, dequant_multiplier
+
+    def to_blocks(self, channel):
+        """
+        Function Documentation:
+        Split a channel into 8x8 blocks (edges are padded by repeating the last row/column)
+        Args:
+        channel: The 2D channel array
+        Returns:
+        The blocks, shape (rows of blocks, columns of blocks, 8, 8)
         """
-        image = self.image
-        image_array = np.array(image)
-        h = image_array.shape[0]
-        w = image_array.shape[1]
+        h, w = channel.shape
+        padded = np.pad(channel, ((0, -h % 8), (0, -w % 8)), mode="edge")
+        bh, bw = padded.shape[0] // 8, padded.shape[1] // 8
+        return padded.reshape(bh, 8, bw, 8).swapaxes(1, 2)
 
-        compressed_image = np.zeros((h, w))
+    def from_blocks(self, blocks, h, w):
+        """
+        Function Documentation:
+        Join 8x8 blocks back into a channel of size h x w
+        Args:
+        blocks: The blocks, shape (rows of blocks, columns of blocks, 8, 8)
+        h, w: The size of the channel
+        Returns:
+        The 2D channel array
+        """
+        bh, bw = blocks.shape[:2]
+        return blocks.swapaxes(1, 2).reshape(bh * 8, bw * 8)[:h, :w]
+
+    def integer_quantize_blocks(self, blocks):
+        """
+        Function Documentation:
+        Apply the integer AAN DCT and quantization to a batch of 8x8 blocks
+        Args:
+        blocks: uint8 blocks, shape (..., 8, 8)
+        Returns:
+        The quantized coefficients (int16)
+        """
+        quant_reciprocal, quant_shift, _ = self.integer_tables()
+        samples = (blocks.astype(np.int16) - 128).astype(np.int32) << AAN_PASS_BITS
+        coefficients = _aan_fdct_1d(_aan_fdct_1d(samples).swapaxes(-1, -2)).swapaxes(-1, -2)
+        magnitude = _descale(np.abs(coefficients) * quant_reciprocal, quant_shift)
+        return (np.sign(coefficients) * magnitude).astype(np.int16)
 
+    def integer_dequantize_blocks(self, quantized):
+        """
+        Function Documentation:
+        Apply the dequantization and integer AAN IDCT to a batch of quantized blocks
+        Args:
+        quantized: The quantized coefficients, shape (..., 8, 8)
+        Returns:
+        The reconstructed uint8 blocks
+        """
+        _, _, dequant_multiplier = self.integer_tables()
+        return integer_dequantize_idct(quantized, dequant_multiplier)
+
+    def integer_quantize_channel(self, channel):
+        """
+        Function Documentation:
+        Quantize a whole channel with the integer path, INTEGER_STRIP_ROWS block rows at a time
+        Args:
+        channel: The 2D channel array
+        Returns:
+        The quantized coefficients (int16), shape (rows of blocks, columns of blocks, 8, 8)
+        """
+        h, w = channel.shape
+        quantized = np.empty((-(-h // 8), -(-w // 8), 8, 8), dtype=np.int16)
+        for i in range(0, quantized.shape[0], INTEGER_STRIP_ROWS):
+            strip = channel[i * 8 : (i + INTEGER_STRIP_ROWS) * 8]
+            quantized[i : i + INTEGER_STRIP_ROWS] = self.integer_quantize_blocks(self.to_blocks(strip))
+        return quantized
+
+    def compress_channel(self, channel):
+        """
+        Function Documentation:
+        Compress and reconstruct one channel with the selected transform path
+        Args:
+        channel: The 2D channel array
+        Returns:
+        The reconstructed channel
+        """
+        h, w = channel.shape
+
+        if self.dct_mode == "integer":
+            compressed_channel = np.empty((h, w), dtype=np.uint8)
+            for i in range(0, h, INTEGER_STRIP_ROWS * 8):
+                strip = channel[i : i + INTEGER_STRIP_ROWS * 8]
+                quantized = self.integer_quantize_blocks(self.to_blocks(strip))
+                compressed_channel[i : i + strip.shape[0]] = self.from_blocks(
+                    self.integer_dequantize_blocks(quantized), strip.shape[0], w
+                )
+            return compressed_channel
+
+        compressed_channel = np.zeros((h, w))
         for i in range(0, h, 8):
             for j in range(0, w, 8):
-                block = image_array[i:i+8, j:j+8]
+                block = channel[i:i+8, j:j+8]
                 dct_block = self.apply_dct(block)
                 quantized_block = self.quantize(dct_block)
                 dequantized_block = self.dequantize(quantized_block)
                 idct_block = self.apply_idct(dequantized_block)
-                compressed_image[i:i+8, j:j+8] = idct_block
+                compressed_channel[i:i+8, j:j+8] = idct_block
+        return compressed_channel
+
+    def grayscale_compression(self):
+        """
+        Function Documentation:
+        Compress the image
+        Saves the compressed image to the disk (adds a suffix "_compressed" to the original image name)
+        Args:
+        None
+        Returns:
+        compressed_image: The compressed image
+        """
+        image_array = np.array(self.image)
+        compressed_image = self.compress_channel(image_array)
 
         return self.save_image(compressed_image)
 
@@ -167,22 +413,10 @@ class Compressor:
         Returns:
         compressed_image: The compressed image
         """
-        image = self.image
-        image_array = np.array(image)
-        h = image_array.shape[0]
-        w = image_array.shape[1]
-
-        compressed_image = np.zeros((h, w, 3))
-
-        for i in range(0, h, 8):
-            for j in range(0, w, 8):
-                for k in range(3):
-                    block = image_array[i:i+8, j:j+8, k]
-                    dct_block = self.apply_dct(block)
-                    quantized_block = self.quantize(dct_block)
-                    dequantized_block = self.dequantize(quantized_block)
-                    idct_block = self.apply_idct(dequantized_block)
-                    compressed_image[i:i+8, j:j+8, k] = idct_block
+        image_array = np.array(self.image)
+        compressed_image = np.stack(
+            [self.compress_channel(image_array[:, :, k]) for k in range(3)], axis=-1
+        )
 
         return self.save_image(compressed_image)
 
@@ -222,4 +456,63 @@ class Compressor:
         if self.image.mode == "RGB":
             return self.rgb_compression()
         
-        return self.grayscale_compression()
\ No newline at end of file
+        return self.grayscale_compression()
+
+
+def psnr(original, compressed):
+    """
+    Function Documentation:
+    Peak signal-to-noise ratio between two 8-bit images
+    Args:
+    original: The reference image array
+    compressed: The compared image array
+    Returns:
+    The PSNR in dB (inf for identical images)
+    """
+    mse = np.mean((np.asarray(original, dtype=np.float64) - np.clip(compressed, 0, 255)) ** 2)
+    return float("inf") if mse == 0 else 10 * np.log10(255 ** 2 / mse)
+
+
+def benchmark_dct_paths(image_path, qualities=(1, 5, 10, 50, 100)):
+    """
+    Function Documentation:
+    Compare the float and integer transform paths on the luminance of an image
+    Prints the time, the peak memory of the working buffers and the PSNR of each path,
+    for every quality
+    Args:
+    image_path: The path of the input image file.
+    qualities: The qualities to compare the paths at.
+    Returns:
+    A dict, per quality, with the measurements of each path and the PSNR between the two outputs
+    """
+    channel = np.array(Image.open(image_path).convert("L"))
+    results = {}
+
+    for quality in qualities:
+        results[quality] = {}
+        outputs = {}
+        print(f"quality {quality}:")
+        for mode in ("float", "integer"):
+            comp = Compressor(image_path, quality, dct_mode=mode)
+            tracemalloc.start()
+            start = time.perf_counter()
+            outputs[mode] = comp.compress_channel(channel)
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            results[quality][mode] = {
+                "seconds": elapsed,
+                "peak_bytes": peak,
+                "psnr": psnr(channel, outputs[mode]),
+            }
+            print(f"{mode:>10}: {elapsed:.3f}s, peak {peak / 1024:.1f} KB, "
+                  f"PSNR {results[quality][mode]['psnr']:.2f} dB")
+
+        between = psnr(np.clip(outputs["float"], 0, 255), outputs["integer"])
+        results[quality]["psnr_between_paths"] = between
+        print(f"  PSNR float vs integer: {between:.2f} dB")
+    return results
+
+
+# Calling the function for benchmarking
+# benchmark_dct_paths("Images/JPEG Samples/10164073235_f29931d91e.jpg")
@@ -1,6 +1,8 @@
 import numpy as np
 from PIL import Image
 import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
 
 class MedianFilter:
@@ -17,6 +19,7 @@ class MedianFilter:
      __init__: The constructor method used to initialize the class attributes.
      median_filter_custom: The method used to apply median filter to an image or array.
      process_image: The method used to process the image.
+     temporal_median_stream: The method used to denoise a stream of frames of the same scene.
     """
 
     def __init__(self, input_path=None):
@@ -96,6 +99,167 @@ class MedianFilter:
 
         return filtered_image
 
+    def temporal_median_stream(
+        self, frames, depth=5, size=1, method="padding", workers=None
+    ):
+        """Applies a temporal (size=1) or spatio-temporal median to a stream of frames
+
+        The last `depth` frames are kept in a preallocated ring buffer and one
+        denoised frame is yielded per input frame, so memory stays bounded no
+        matter how long the stream is. Until the buffer is full the median is
+        taken over the frames seen so far. Spatial windows match
+        median_filter_custom for the same size and method. Rows are split into
+        strips that are filtered on a thread pool (numpy releases the GIL).
+        """
+
+        if depth < 1:
+            raise ValueError("depth must be at least 1")
+        if method not in ("padding", "reflect", "edge", "symmetric", "crop"):
+            raise ValueError(
+                "Invalid method. Choose from 'padding', 'reflect', 'edge', 'symmetric', 'crop'."
+            )
+
+        pad = size // 2
+        # median_filter_custom uses size-wide windows over the padded frame,
+        # and (2 * pad + 1)-wide windows over the unpadded frame for "crop"
+        window = 2 * pad + 1 if method == "crop" else size
+        workers = workers or os.cpu_count() or 1
+        buffer = scratch = None
+        count = 0
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for frame in frames:
+                frame = np.asarray(frame)
+                if frame.ndim != 2:
+                    raise ValueError("Frames must be 2D (grayscale) arrays")
+
+                if buffer is None:
+                    h, w = frame.shape
+                    if method != "crop":
+                        buffer = np.empty((depth, h + 2 * pad, w + 2 * pad), frame.dtype)
+                        out_h, out_w = h, w
+                    else:
+                        buffer = np.empty((depth, h, w), frame.dtype)
+                        out_h, out_w = h - 2 * pad, w - 2 * pad
+                    # One plane per value of the neighbourhood, plus a spare for swaps
+                    scratch = np.empty((depth * window * window + 1, out_h, out_w), frame.dtype)
+                    strip = max(1, -(-out_h // (workers * 4)))
+                    strips = [(r, min(r + strip, out_h)) for r in range(0, out_h, strip)]
+                elif frame.shape != (h, w):
+                    raise ValueError("All frames must have the same shape")
+
+                slot = count % depth
+                if method == "crop" or pad == 0:
+                    buffer[slot] = frame
+                else:
+                    buffer[slot, pad : pad + h, pad : pad + w] = frame
+                    self._fill_border(buffer[slot], pad, method)
+                count += 1
+                filled = min(count, depth)
+                network = _median_network(filled * window * window)
+
+                filtered_frame = np.empty((out_h, out_w), frame.dtype)
+                tasks = [
+                    pool.submit(
+                        self._median_strip,
+                        buffer, scratch, filtered_frame, filled, window, network, r0, r1,
+                    )
+                    for r0, r1 in strips
+                ]
+                for task in tasks:
+                    task.result()
+
+                yield filtered_frame
+
+    def _fill_border(self, plane, pad, method):
+        """Fills the pad-wide border of a padded plane in place, as np.pad would"""
+
+        h, w = plane.shape[0] - 2 * pad, plane.shape[1] - 2 * pad
+        if method in ("reflect", "symmetric") and min(h, w) <= pad:
+            # np.pad reflects repeatedly when the frame is smaller than the border
+            plane[...] = np.pad(plane[pad : pad + h, pad : pad + w], pad, mode=method)
+            return
+
+        # Rows first, then columns over the full height, so corners match np.pad
+        for axis in (0, 1):
+            lines = plane if axis == 0 else plane.T
+            n = h if axis == 0 else w
+            if method == "padding":
+                top, bottom = 0, 0
+            elif method == "edge":
+                top, bottom = lines[pad], lines[pad + n - 1]
+            elif method == "reflect":
+                top = lines[pad + 1 : 2 * pad + 1][::-1]
+                bottom = lines[n - 1 : n + pad - 1][::-1]
+            else:
+                top = lines[pad : 2 * pad][::-1]
+                bottom = lines[n : n + pad][::-1]
+            lines[:pad] = top
+            lines[pad + n :] = bottom
+
+    def _median_strip(self, buffer, scratch, out, filled, window, network, r0, r1):
+        """Median over a window x window x filled neighbourhood of rows r0:r1 using a min/max network"""
+
+        out_w = out.shape[1]
+        planes = []
+        for t in range(filled):
+            for dy in range(window):
+                for dx in range(window):
+                    plane = scratch[len(planes), r0:r1]
+                    plane[...] = buffer[t, r0 + dy : r1 + dy, dx : dx + out_w]
+                    planes.append(plane)
+        spare = scratch[-1, r0:r1]
+
+        comparators, middle = network
+        for i, j, keep_min, keep_max in comparators:
+            if keep_min and keep_max:
+                np.minimum(planes[i], planes[j], out=spare)
+                np.maximum(planes[i], planes[j], out=planes[j])
+                planes[i], spare = spare, planes[i]
+            elif keep_min:
+                np.minimum(planes[i], planes[j], out=planes[i])
+            else:
+                np.maximum(planes[i], planes[j], out=planes[j])
+
+        if len(middle) == 1:
+            out[r0:r1] = planes[middle[0]]
+        else:
+            out[r0:r1] = (planes[middle[0]].astype(np.float64) + planes[middle[1]]) / 2
+
+
+@lru_cache(maxsize=None)
+def _median_network(n):
+    """
+    Comparators of a Batcher odd-even merge sort on n values, pruned to the ones
+    the median depends on. Each comparator is (i, j, keep_min, keep_max).
+    """
+    length = 1
+    while length < n:
+        length *= 2
+
+    # Positions >= n hold +inf in the full network, so comparators touching them are no-ops
+    comparators = []
+    p = 1
+    while p < length:
+        k = p
+        while k >= 1:
+            for j in range(k % p, length - k, 2 * k):
+                for i in range(min(k, length - j - k)):
+                    if (i + j) // (2 * p) == (i + j + k) // (2 * p) and i + j + k < n:
+                        comparators.append((i + j, i + j + k))
+            k //= 2
+        p *= 2
+
+    middle = (n // 2,) if n % 2 else (n // 2 - 1, n // 2)
+    needed = set(middle)
+    pruned = []
+    for a, b in reversed(comparators):
+        keep_min, keep_max = a in needed, b in needed
+        if keep_min or keep_max:
+            pruned.append((a, b, keep_min, keep_max))
+            needed.update((a, b))
+    return tuple(reversed(pruned)), middle
+
 
 def test_filter_on_custom_array_median():
     """
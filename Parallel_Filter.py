@@ -0,0 +1,194 @@
+"""
+Module Documentation:
+This module is used to run the median and average filters on several cores.
+The image is split into tiles, and each tile is filtered in its own worker process.
+Steps of parallel filtering:
+1. Pad the image once, using the chosen edge-handling method, into shared memory.
+2. Allocate the output image in shared memory.
+3. Split the output into tiles, each tile reading a halo of size // 2 rows and columns.
+4. Every worker attaches to the shared blocks by name and filters its tiles in place.
+5. Copy the output out of shared memory and release the shared blocks.
+Since the padded image already holds the halos, every tile uses the same windows as
+the single-process filter (size-wide from the padded top-left, or centred for "crop"),
+so the result is identical to the single-process output, for odd and even sizes.
+"""
+
+import os
+import numpy as np
+from multiprocessing import Pool, shared_memory
+
+from Median_Filter import MedianFilter
+from Average_Filter import AverageFilter
+
+
+def _filter_tile(task):
+    """
+    Function Documentation:
+    Filter one tile inside a worker process (no array is pickled, only block names)
+    Args:
+    task: (filter name, size, method, input block, input shape, input dtype,
+           output block, output shape, output dtype, row, column, tile height, tile width)
+    Returns:
+    None
+    """
+    (filter_name, size, method, in_name, in_shape, in_dtype,
+     out_name, out_shape, out_dtype, i, j, th, tw) = task
+
+    in_shm = shared_memory.SharedMemory(name=in_name)
+    out_shm = shared_memory.SharedMemory(name=out_name)
+    try:
+        source = np.ndarray(in_shape, dtype=in_dtype, buffer=in_shm.buf)
+        target = np.ndarray(out_shape, dtype=out_dtype, buffer=out_shm.buf)
+
+        if method == "crop":
+            # "crop" windows are centred and 2 * (size // 2) + 1 wide
+            pad = size // 2
+            window = source[i : i + th + 2 * pad, j : j + tw + 2 * pad]
+            if filter_name == "median":
+                tile = MedianFilter().median_filter_custom(window, size, "crop")
+            else:
+                tile = AverageFilter().average_filter_custom(window, size, "crop")
+        else:
+            # Other methods use size-wide windows starting at the padded top-left
+            window = source[i : i + th + size - 1, j : j + tw + size - 1]
+            tile = np.zeros((th, tw), dtype=source.dtype)
+            reduce = np.median if filter_name == "median" else np.mean
+            for a in range(th):
+                for b in range(tw):
+                    tile[a, b] = reduce(window[a : a + size, b : b + size])
+        target[i : i + th, j : j + tw] = tile
+        del source, target, window
+    finally:
+        in_shm.close()
+        out_shm.close()
+
+
+class ParallelTileFilter:
+    """
+    Class Documentation:
+    This class is used to apply the median or average filter to an image or array
+    using several worker processes that share the input and output through
+    multiprocessing.shared_memory.
+
+    Args:
+    filter_name: "median" or "average".
+    workers: The number of worker processes (defaults to the core count).
+    tile_size: The height and width of each output tile.
+
+    Methods:
+    __init__: The constructor method used to initialize the class attributes.
+    filter_array: The method used to filter an array in parallel.
+    """
+
+    def __init__(self, filter_name="median", workers=None, tile_size=256):
+        """
+        Function Documentation:
+        The constructor method used to initialize the class attributes.
+        """
+        if filter_name not in ("median", "average"):
+            raise ValueError("Invalid filter. Choose from 'median', 'average'.")
+        self.filter_name = filter_name
+        self.workers = workers or os.cpu_count() or 1
+        self.tile_size = tile_size
+
+    def _output_dtype(self, image_array, method):
+        """Dtype of the single-process output for this filter and method"""
+        if self.filter_name == "average":
+            return np.dtype(np.uint8)
+        if method == "crop":
+            return np.dtype(np.float64)
+        return image_array.dtype
+
+    def filter_array(self, image_array, size=3, method="padding"):
+        """
+        Function Documentation:
+        Filter a 2D array across several processes.
+        Args:
+        image_array: The input 2D array (image or custom array).
+        size: The size of the neighborhood (e.g., 3 for a 3x3 filter).
+        method: The method for edge handling ("padding", "crop", "reflect", "edge", "symmetric").
+        Returns:
+        The filtered array, identical to the single-process filter.
+        """
+        image_array = np.asarray(image_array)
+        pad = size // 2
+
+        if method == "padding":
+            padded_img = np.pad(image_array, pad, mode="constant", constant_values=0)
+        elif method in ("reflect", "edge", "symmetric"):
+            padded_img = np.pad(image_array, pad, mode=method)
+        elif method == "crop":
+            padded_img = image_array
+        else:
+            raise ValueError(
+                "Invalid method. Choose from 'padding', 'reflect', 'edge', 'symmetric', 'crop'."
+            )
+
+        out_h = padded_img.shape[0] - 2 * pad
+        out_w = padded_img.shape[1] - 2 * pad
+        out_dtype = self._output_dtype(image_array, method)
+
+        in_shm = shared_memory.SharedMemory(create=True, size=max(1, padded_img.nbytes))
+        out_shm = shared_memory.SharedMemory(
+            create=True, size=max(1, out_h * out_w * out_dtype.itemsize)
+        )
+        try:
+            source = np.ndarray(padded_img.shape, dtype=padded_img.dtype, buffer=in_shm.buf)
+            source[...] = padded_img
+            del padded_img
+
+            tasks = [
+                (self.filter_name, size, method,
+                 in_shm.name, source.shape, source.dtype.str,
+                 out_shm.name, (out_h, out_w), out_dtype.str,
+                 i, j, min(self.tile_size, out_h - i), min(self.tile_size, out_w - j))
+                for i in range(0, out_h, self.tile_size)
+                for j in range(0, out_w, self.tile_size)
+            ]
+
+            if self.workers == 1:
+                for task in tasks:
+                    _filter_tile(task)
+            else:
+                with Pool(self.workers) as pool:
+                    pool.map(_filter_tile, tasks, chunksize=1)
+
+            target = np.ndarray((out_h, out_w), dtype=out_dtype, buffer=out_shm.buf)
+            filtered_img = target.copy()
+            del source, target
+        finally:
+            in_shm.close()
+            in_shm.unlink()
+            out_shm.close()
+            out_shm.unlink()
+
+        return filtered_img
+
+
+def test_parallel_filter_equivalence():
+    """
+    This function checks that the parallel filters give the same output as the
+    single-process filters for every edge-handling method and for odd and even sizes.
+    """
+    image_array = np.random.default_rng(0).integers(0, 256, (45, 53), dtype=np.uint8)
+    single = {
+        "median": MedianFilter().median_filter_custom,
+        "average": AverageFilter().average_filter_custom,
+    }
+
+    for filter_name, reference in single.items():
+        parallel = ParallelTileFilter(filter_name, workers=2, tile_size=16)
+        for method in ("padding", "crop", "reflect", "edge", "symmetric"):
+            for size in (2, 3, 4, 5):
+                expected = reference(image_array, size, method)
+                result = parallel.filter_array(image_array, size, method)
+                same = (
+                    expected.shape == result.shape
+                    and expected.dtype == result.dtype
+                    and np.array_equal(expected, result)
+                )
+                print(f"{filter_name:>7} {method:>9} size {size}: {'ok' if same else 'MISMATCH'}")
+
+
+# Calling the function for testing
+# test_parallel_filter_equivalence()
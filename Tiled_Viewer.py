@@ -0,0 +1,438 @@
+"""
+Module Documentation:
+This module is used to show two images side by side on the compare screens
+without uploading them as two full-resolution pixmaps.
+Steps of tiled viewing:
+1. Build an image pyramid lazily (level k is the image scaled down by 2^k).
+2. Pick the pyramid level that matches the current zoom of the view.
+3. Convert and upload only the tiles of that level that intersect the visible area.
+4. Keep the uploaded tiles in an LRU cache and evict the least recently used ones.
+5. Keep zoom and pan of both views synchronized.
+6. Optionally draw a difference heatmap, computed lazily per visible tile.
+"""
+
+import math
+from collections import OrderedDict
+
+import numpy as np
+from PIL import Image
+from PyQt5 import QtGui
+from PyQt5.QtCore import QEvent, QObject, QRectF, Qt, pyqtSlot
+from PyQt5.QtWidgets import QGraphicsItem, QGraphicsScene, QStyleOptionGraphicsItem
+
+
+class ImagePyramid:
+    """
+    Class Documentation:
+    This class is used to decode an image at several resolutions on demand.
+    JPEG files are decoded at reduced size directly (PIL draft mode), so coarse
+    levels never need the full-resolution image in memory. Uncompressed files
+    (PPM, raw TIFF) are memory-mapped, so full-resolution tiles read only their rows.
+    At most max_levels decoded levels are kept, least recently used first out.
+
+    Args:
+    image_path: The path of the image file.
+    tile_size: The height and width of each tile in pixels.
+    max_levels: The maximum number of decoded levels kept in memory.
+
+    Attributes:
+    width, height: The size of the full-resolution image.
+    levels: The number of pyramid levels.
+    """
+
+    def __init__(self, image_path, tile_size=256, max_levels=2):
+        """
+        Function Documentation:
+        The constructor method used to initialize the class attributes.
+        """
+        self.image_path = image_path
+        self.tile_size = tile_size
+        self.max_levels = max_levels
+        with Image.open(image_path) as image:
+            self.width, self.height = image.size
+            self.mode = "L" if image.mode in ("L", "1") else "RGB"
+            self._raw = self.raw_layout(image)
+        longest = max(self.width, self.height, 1)
+        self.levels = max(1, math.ceil(math.log2(longest / tile_size)) + 1)
+        self._decoded = OrderedDict()
+
+    def release(self):
+        """Drops every decoded level"""
+        self._decoded.clear()
+
+    def raw_layout(self, image):
+        """Returns (offset, row stride) if the pixels are stored uncompressed, top-down, else None"""
+        if len(image.tile) != 1 or image.mode != self.mode:
+            return None
+        codec, extents, offset, args = image.tile[0]
+        if isinstance(args, str):
+            args = (args,)
+        rawmode = args[0]
+        stride = args[1] if len(args) > 1 else 0
+        orientation = args[2] if len(args) > 2 else 1
+        if codec != "raw" or rawmode != self.mode or orientation != 1:
+            return None
+        if extents != (0, 0, self.width, self.height):
+            return None
+        return offset, stride or self.width * len(self.mode)
+
+    def level_size(self, level):
+        """Returns the (width, height) of a level"""
+        return (
+            max(1, math.ceil(self.width / 2**level)),
+            max(1, math.ceil(self.height / 2**level)),
+        )
+
+    def level_for_scale(self, scale):
+        """Returns the coarsest level that still has at least one pixel per screen pixel"""
+        if scale <= 0:
+            return self.levels - 1
+        return min(self.levels - 1, max(0, int(math.floor(math.log2(1 / scale)))))
+
+    def level_image(self, level):
+        """Returns the decoded image of a level, decoding it on first use"""
+        if level in self._decoded:
+            self._decoded.move_to_end(level)
+            return self._decoded[level]
+
+        size = self.level_size(level)
+        image = Image.open(self.image_path)
+        image.draft(self.mode, size)
+        image = image.convert(self.mode)
+        if image.size != size:
+            image = image.resize(size, Image.BILINEAR)
+        self._decoded[level] = image
+        while len(self._decoded) > self.max_levels:
+            self._decoded.popitem(last=False)
+        return image
+
+    def region(self, level, box):
+        """Returns the pixels of a (x0, y0, x1, y1) box of a level as a numpy array"""
+        x0, y0, x1, y1 = box
+        if level == 0 and self._raw is not None:
+            offset, stride = self._raw
+            rows = np.memmap(
+                self.image_path, dtype=np.uint8, mode="r",
+                offset=offset + y0 * stride, shape=(y1 - y0, stride),
+            )
+            channels = len(self.mode)
+            pixels = np.array(rows[:, x0 * channels : x1 * channels])
+            del rows
+            return pixels if channels == 1 else pixels.reshape(y1 - y0, x1 - x0, channels)
+        return np.asarray(self.level_image(level).crop(box))
+
+    def tiles_in_rect(self, level, rect):
+        """Returns the (column, row) of the tiles of a level that intersect a full-resolution rect"""
+        span = self.tile_size * 2**level
+        first_col = max(0, int(rect.left() // span))
+        first_row = max(0, int(rect.top() // span))
+        last_col = min(math.ceil(self.width / span), int(rect.right() // span) + 1)
+        last_row = min(math.ceil(self.height / span), int(rect.bottom() // span) + 1)
+        return [
+            (col, row)
+            for row in range(first_row, last_row)
+            for col in range(first_col, last_col)
+        ]
+
+    def tile_rect(self, level, col, row):
+        """Returns the full-resolution rect covered by a tile"""
+        span = self.tile_size * 2**level
+        x, y = col * span, row * span
+        return QRectF(x, y, min(span, self.width - x), min(span, self.height - y))
+
+    def tile_array(self, level, col, row):
+        """Returns the pixels of a tile as a numpy array"""
+        width, height = self.level_size(level)
+        x, y = col * self.tile_size, row * self.tile_size
+        box = (x, y, min(x + self.tile_size, width), min(y + self.tile_size, height))
+        return self.region(level, box)
+
+
+class TileCache:
+    """
+    Class Documentation:
+    This class is used to keep the most recently drawn tile pixmaps.
+    When the cache is full the least recently used tile is evicted.
+
+    Args:
+    capacity: The maximum number of tiles kept.
+    """
+
+    def __init__(self, capacity=256):
+        """
+        Function Documentation:
+        The constructor method used to initialize the class attributes.
+        """
+        self.capacity = capacity
+        self._tiles = OrderedDict()
+
+    def get(self, key, build):
+        """Returns the cached tile for key, building it with build() on a miss"""
+        if key in self._tiles:
+            self._tiles.move_to_end(key)
+            return self._tiles[key]
+        tile = build()
+        self._tiles[key] = tile
+        while len(self._tiles) > self.capacity:
+            self._tiles.popitem(last=False)
+        return tile
+
+    def clear(self):
+        """Drops every cached tile"""
+        self._tiles.clear()
+
+
+def array_to_pixmap(array):
+    """
+    Function Documentation:
+    Convert a grayscale, RGB or RGBA uint8 array to a QPixmap
+    Args:
+    array: The image array
+    Returns:
+    The QPixmap
+    """
+    array = np.ascontiguousarray(array, dtype=np.uint8)
+    h, w = array.shape[:2]
+    if array.ndim == 2:
+        fmt = QtGui.QImage.Format_Grayscale8
+    elif array.shape[2] == 3:
+        fmt = QtGui.QImage.Format_RGB888
+    else:
+        fmt = QtGui.QImage.Format_RGBA8888
+    image = QtGui.QImage(array.data, w, h, array.strides[0], fmt)
+    return QtGui.QPixmap.fromImage(image.copy())
+
+
+class TiledImageItem(QGraphicsItem):
+    """
+    Class Documentation:
+    This class is used to draw an image pyramid in a QGraphicsScene.
+    Only the tiles that intersect the exposed area are converted and drawn,
+    at the pyramid level that matches the current zoom.
+
+    Args:
+    pyramid: The ImagePyramid to draw.
+    cache: The TileCache used for the pixmaps.
+    """
+
+    def __init__(self, pyramid, cache):
+        """
+        Function Documentation:
+        The constructor method used to initialize the class attributes.
+        """
+        super(TiledImageItem, self).__init__()
+        self.pyramid = pyramid
+        self.cache = cache
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption, True)
+
+    def boundingRect(self):
+        return QRectF(0, 0, self.pyramid.width, self.pyramid.height)
+
+    def level_for_painter(self, painter):
+        """Returns the pyramid level for the painter's current zoom"""
+        scale = QStyleOptionGraphicsItem.levelOfDetailFromTransform(painter.worldTransform())
+        return self.pyramid.level_for_scale(scale)
+
+    def tile_pixmap(self, level, col, row):
+        """Returns the pixmap of one tile, built lazily"""
+        return self.cache.get(
+            (id(self), level, col, row),
+            lambda: array_to_pixmap(self.pyramid.tile_array(level, col, row)),
+        )
+
+    def paint(self, painter, option, widget=None):
+        painter.setRenderHint(QtGui.QPainter.SmoothPixmapTransform, True)
+        level = self.level_for_painter(painter)
+        exposed = option.exposedRect.intersected(self.boundingRect())
+        for col, row in self.pyramid.tiles_in_rect(level, exposed):
+            pixmap = self.tile_pixmap(level, col, row)
+            painter.drawPixmap(
+                self.pyramid.tile_rect(level, col, row), pixmap, QRectF(pixmap.rect())
+            )
+
+
+class DifferenceItem(TiledImageItem):
+    """
+    Class Documentation:
+    This class is used to draw a heatmap of the absolute difference between two
+    pyramids over the first one. Each heatmap tile is computed the first time it
+    becomes visible.
+
+    Args:
+    pyramid: The ImagePyramid the heatmap is drawn over.
+    other: The ImagePyramid it is compared with.
+    offset: The (x, y) position of other inside pyramid.
+    cache: The TileCache used for the pixmaps.
+    """
+
+    def __init__(self, pyramid, other, offset, cache):
+        """
+        Function Documentation:
+        The constructor method used to initialize the class attributes.
+        """
+        super(DifferenceItem, self).__init__(pyramid, cache)
+        self.other = other
+        self.offset = offset
+
+    def tile_pixmap(self, level, col, row):
+        return self.cache.get(
+            (id(self), level, col, row),
+            lambda: array_to_pixmap(self.heatmap(level, col, row)),
+        )
+
+    def heatmap(self, level, col, row):
+        """Returns an RGBA heatmap tile (red, with alpha proportional to the difference)"""
+        size = self.pyramid.tile_size
+        base_width, base_height = self.pyramid.level_size(level)
+        other_width, other_height = self.other.level_size(level)
+        x, y = col * size, row * size
+        w = min(size, base_width - x)
+        h = min(size, base_height - y)
+
+        # Overlap of this tile with the other image, in this tile's level coordinates
+        ox, oy = self.offset[0] // 2**level, self.offset[1] // 2**level
+        x0, y0 = max(x, ox), max(y, oy)
+        x1 = min(x + w, ox + other_width)
+        y1 = min(y + h, oy + other_height)
+
+        diff = np.zeros((h, w), dtype=np.float32)
+        if x1 > x0 and y1 > y0:
+            base = self.luminance(self.pyramid.region(level, (x0, y0, x1, y1)))
+            other = self.luminance(
+                self.other.region(level, (x0 - ox, y0 - oy, x1 - ox, y1 - oy))
+            )
+            diff[y0 - y : y1 - y, x0 - x : x1 - x] = np.abs(base - other)
+
+        heat = np.zeros((h, w, 4), dtype=np.uint8)
+        heat[..., 0] = 255
+        heat[..., 3] = np.clip(diff * 4, 0, 255).astype(np.uint8)
+        return heat
+
+    def luminance(self, pixels):
+        """Returns a grayscale or RGB tile as a float32 luminance array"""
+        if pixels.ndim == 2:
+            return pixels.astype(np.float32)
+        return np.asarray(Image.fromarray(pixels).convert("L"), dtype=np.float32)
+
+
+class CompareViewer(QObject):
+    """
+    Class Documentation:
+    This class is used to show two images in two QGraphicsViews with linked zoom and pan.
+    Mouse wheel zooms both views, scrolling one view scrolls the other,
+    and the "D" key toggles the difference heatmap on the second view.
+
+    Args:
+    old_view: The QGraphicsView of the original image.
+    new_view: The QGraphicsView of the processed image.
+    old_path: The path of the original image.
+    new_path: The path of the processed image.
+    cache_tiles: The maximum number of tiles kept in the cache.
+
+    Methods:
+    clear: The method used to release the scenes and cached tiles.
+    toggle_difference: The method used to show or hide the heatmap.
+    """
+
+    def __init__(self, old_view, new_view, old_path, new_path, cache_tiles=256):
+        """
+        Function Documentation:
+        The constructor method used to initialize the class attributes.
+        """
+        super(CompareViewer, self).__init__()
+        self.views = [old_view, new_view]
+        self.cache = TileCache(cache_tiles)
+        old = ImagePyramid(old_path)
+        new = ImagePyramid(new_path)
+        self.pyramids = [old, new]
+
+        # Center the processed image over the original ("crop" filters shrink it)
+        offset = ((old.width - new.width) // 2, (old.height - new.height) // 2)
+        rect = QRectF(0, 0, max(old.width, new.width), max(old.height, new.height))
+
+        self.scenes = []
+        for view, pyramid, position in ((old_view, old, (0, 0)), (new_view, new, offset)):
+            scene = QGraphicsScene()
+            scene.setSceneRect(rect)
+            item = TiledImageItem(pyramid, self.cache)
+            item.setPos(*position)
+            scene.addItem(item)
+            self.scenes.append(scene)
+            view.setScene(scene)
+            view.setTransformationAnchor(view.AnchorUnderMouse)
+            view.setDragMode(view.ScrollHandDrag)
+            view.viewport().installEventFilter(self)
+            view.installEventFilter(self)
+            view.fitInView(rect, Qt.KeepAspectRatio)
+            view.show()
+
+        self.difference = DifferenceItem(new, old, (-offset[0], -offset[1]), self.cache)
+        self.difference.setPos(*offset)
+        self.difference.setVisible(False)
+        self.scenes[1].addItem(self.difference)
+
+        self._syncing = False
+        for view in self.views:
+            for bar in (view.horizontalScrollBar(), view.verticalScrollBar()):
+                bar.valueChanged.connect(self.scrolled)
+
+    @pyqtSlot(int)
+    def scrolled(self, _):
+        """Syncs the other views when a scroll bar of one view moves"""
+        bar = self.sender()
+        for view in self.views:
+            if bar in (view.horizontalScrollBar(), view.verticalScrollBar()):
+                self.sync_from(view)
+                return
+
+    def sync_from(self, source):
+        """Copies the transform and scroll position of source to the other views"""
+        if self._syncing:
+            return
+        self._syncing = True
+        for view in self.views:
+            if view is not source:
+                view.setTransform(source.transform())
+                view.horizontalScrollBar().setValue(source.horizontalScrollBar().value())
+                view.verticalScrollBar().setValue(source.verticalScrollBar().value())
+        self._syncing = False
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Wheel:
+            for view in self.views:
+                if obj is view.viewport():
+                    factor = 1.25 ** (event.angleDelta().y() / 120)
+                    view.scale(factor, factor)
+                    self.sync_from(view)
+                    return True
+        if event.type() == QEvent.KeyPress and event.key() == Qt.Key_D:
+            self.toggle_difference()
+            return True
+        return False
+
+    def toggle_difference(self):
+        """Shows or hides the difference heatmap on the second view"""
+        if self.difference is not None:
+            self.difference.setVisible(not self.difference.isVisible())
+
+    def clear(self):
+        """Releases the scenes, cached tiles and decoded levels, and unlinks the views"""
+        for view in self.views:
+            view.horizontalScrollBar().valueChanged.disconnect(self.scrolled)
+            view.verticalScrollBar().valueChanged.disconnect(self.scrolled)
+            view.viewport().removeEventFilter(self)
+            view.removeEventFilter(self)
+            view.setScene(None)
+        self.views = []
+
+        if self.difference is not None:
+            self.difference.scene().removeItem(self.difference)
+            self.difference = None
+        for scene in self.scenes:
+            scene.clear()
+        self.scenes = []
+
+        for pyramid in self.pyramids:
+            pyramid.release()
+        self.pyramids = []
+        self.cache.clear()
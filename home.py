@@ -12,6 +12,7 @@ import ctypes
 from JPEG_Compression import Compressor
 from Median_Filter import MedianFilter
 from Average_Filter import AverageFilter
+from Tiled_Viewer import CompareViewer
 
 
 class Home(QMainWindow):
@@ -77,17 +78,15 @@ class JPEG(QMainWindow):
         self.show_images()
 
     def view_to_home(self):
-        self.old_image_view.setScene(None)
-        self.new_image_view.setScene(None)
+        self.compare_viewer.clear()
+        self.compare_viewer = None
         self.reset_fields()
         widgets.setCurrentWidget(home)
 
     def show_images(self):
-        scene = QGraphicsScene()
-        pixmap = QtGui.QPixmap(self.input_path)
-        scene.addPixmap(pixmap)
-        self.old_image_view.setScene(scene)
-        self.old_image_view.show()
+        self.compare_viewer = CompareViewer(
+            self.old_image_view, self.new_image_view, self.input_path, self.output_path
+        )
         self.osize_value.setText(f"{os.path.getsize(self.input_path) / 1024:.2f} KB")
         self.nsize_value.setText(f"{os.path.getsize(self.output_path) / 1024:.2f} KB")
 
@@ -96,12 +95,6 @@ class JPEG(QMainWindow):
         )  # percentage compression
         self.comp_value.setText(f"{(1-ratio) * 100:.2f}%")
 
-        scene = QGraphicsScene()
-        pixmap = QtGui.QPixmap(self.output_path)
-        scene.addPixmap(pixmap)
-        self.new_image_view.setScene(scene)
-        self.new_image_view.show()
-
 
 class NoiseReduction(QMainWindow):
     def __init__(self):
@@ -162,22 +155,15 @@ class NoiseReduction(QMainWindow):
     def show_images(self):
         loadUi("noise_compare.ui", self)
         self.home_button.clicked.connect(self.view_to_home)
-        scene = QGraphicsScene()
-        pixmap = QtGui.QPixmap(self.input_path)
-        scene.addPixmap(pixmap)
-        self.old_image_view.setScene(scene)
-        self.old_image_view.show()
-        scene = QGraphicsScene()
-        pixmap = QtGui.QPixmap(self.output_path)
-        scene.addPixmap(pixmap)
-        self.new_image_view.setScene(scene)
-        self.new_image_view.show()
+        self.compare_viewer = CompareViewer(
+            self.old_image_view, self.new_image_view, self.input_path, self.output_path
+        )
 
     def view_to_home(
         self,
     ):  # Reset fields and go back to home from noise reduction comparison
-        self.old_image_view.setScene(None)
-        self.new_image_view.setScene(None)
+        self.compare_viewer.clear()
+        self.compare_viewer = None
         self.reset_fields()
         self.state = False
         widgets.setCurrentWidget(home)